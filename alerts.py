@@ -0,0 +1,182 @@
+import json
+import logging
+import subprocess
+import sys
+import threading
+import urllib.request
+from collections import deque
+
+from clock import SystemClock
+
+logger = logging.getLogger("posture.alerts")
+
+
+class RateLimiter:
+    """Allow an event key through at most once every `interval` seconds"""
+
+    def __init__(self, interval, clock=None):
+        self.interval = interval
+        self.clock = clock if clock is not None else SystemClock()
+        self._last = {}
+
+    def allow(self, key):
+        now = self.clock.now()
+        last = self._last.get(key)
+        if last is not None and now - last < self.interval:
+            return False
+        self._last[key] = now
+        return True
+
+    def reset(self, key=None):
+        if key is None:
+            self._last.clear()
+        else:
+            self._last.pop(key, None)
+
+
+#sinks receive (key, payload) on the dispatcher thread, so they are allowed to block
+class BellSink:
+    """Terminal bell, using winsound on Windows when it is available"""
+
+    def __init__(self, frequency=1000, duration_ms=500):
+        self.frequency = frequency
+        self.duration_ms = duration_ms
+        try:
+            import winsound
+            self._winsound = winsound
+        except ImportError:
+            self._winsound = None
+
+    def __call__(self, key, payload):
+        if self._winsound is not None:
+            self._winsound.Beep(self.frequency, self.duration_ms)
+        else:
+            sys.stdout.write('\a')
+            sys.stdout.flush()
+
+
+class CommandSink:
+    """Run a local command (e.g. ["paplay", "beep.wav"]) for every alert"""
+
+    def __init__(self, command, timeout=5.0):
+        self.command = list(command)
+        self.timeout = timeout
+
+    def __call__(self, key, payload):
+        subprocess.run(self.command, timeout=self.timeout, check=False,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+class WebhookSink:
+    """POST the alert as JSON, meant for a listener on localhost"""
+
+    def __init__(self, url="http://127.0.0.1:8765/alert", timeout=1.0):
+        self.url = url
+        self.timeout = timeout
+
+    def __call__(self, key, payload):
+        body = json.dumps({"event": key, "payload": payload}).encode("utf-8")
+        request = urllib.request.Request(self.url, data=body,
+                                         headers={"Content-Type": "application/json"})
+        with urllib.request.urlopen(request, timeout=self.timeout):
+            pass
+
+
+class LogSink:
+    """Write alerts to a logger"""
+
+    def __init__(self, log=logger, level=logging.WARNING):
+        self.log = log
+        self.level = level
+
+    def __call__(self, key, payload):
+        self.log.log(self.level, "posture alert: %s %s", key, payload if payload is not None else "")
+
+
+class AlertDispatcher:
+    """Single long-lived worker thread that delivers alerts to pluggable sinks.
+
+    The frame loop only calls post(), which rate limits the event and appends it
+    to a bounded deque; it never starts threads or touches I/O. When the deque is
+    full the oldest pending alert is dropped, and identical alerts waiting in the
+    same batch are delivered once.
+    """
+
+    def __init__(self, sinks=None, min_interval=3.0, maxlen=16, clock=None):
+        self.sinks = list(sinks) if sinks is not None else [BellSink()]
+        self.limiter = RateLimiter(min_interval, clock=clock)
+        self.dropped = 0
+        self._pending = deque(maxlen=maxlen)
+        self._wakeup = threading.Event()
+        self._stopping = False
+        self._thread = None
+
+    def start(self):
+        if self._thread is not None:
+            if self._thread.is_alive():
+                if self._stopping:
+                    #a second worker would share the deque with the old one
+                    raise RuntimeError("alert dispatcher is still stopping: a sink is blocking its worker")
+                return self
+            self._thread = None
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="alert-dispatcher", daemon=True)
+        self._thread.start()
+        return self
+
+    def post(self, key, payload=None):
+        """Queue an alert; returns False if it was rate limited"""
+        if not self.limiter.allow(key):
+            return False
+        if len(self._pending) == self._pending.maxlen:
+            self.dropped += 1
+        #deque.append is atomic, so the producer side never takes a lock
+        self._pending.append((key, payload))
+        self._wakeup.set()
+        return True
+
+    def stop(self, timeout=1.0):
+        """Stop the worker; returns False if a sink is still blocking it after `timeout`"""
+        if self._thread is None:
+            return True
+        self._stopping = True
+        self._wakeup.set()
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            return False
+        self._thread = None
+        return True
+
+    def _drain(self):
+        batch = []
+        seen = set()
+        while True:
+            try:
+                key, payload = self._pending.popleft()
+            except IndexError:
+                return batch
+            if key not in seen:
+                seen.add(key)
+                batch.append((key, payload))
+
+    def _deliver(self, key, payload):
+        for sink in self.sinks:
+            try:
+                sink(key, payload)
+            except Exception:
+                logger.exception("alert sink %r failed", sink)
+
+    def _run(self):
+        while not self._stopping:
+            self._wakeup.wait()
+            self._wakeup.clear()
+            for key, payload in self._drain():
+                self._deliver(key, payload)
+        for key, payload in self._drain():
+            self._deliver(key, payload)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
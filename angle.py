@@ -17,4 +17,4 @@ def calculate_angle(a, b, c):
     if angle > 180.0:
         angle = 360 - angle
 
-    return angle
\ No newline at end of file
+    return angle
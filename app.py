@@ -4,6 +4,7 @@ import numpy as np
 import time
 from PIL import Image
 import io
+from alerts import RateLimiter
 
 # Try to import mediapipe, fallback to basic analysis if not available
 try:
@@ -124,13 +125,18 @@ def analyze_posture_mediapipe(image, mp_pose, pose, mp_drawing):
     }
 
 def play_audio_alert():
-    """Play audio alert using HTML audio"""
+    """Play audio alert using HTML audio, at most once every few seconds per session"""
+    if 'audio_limiter' not in st.session_state:
+        st.session_state.audio_limiter = RateLimiter(3.0)
+    if not st.session_state.audio_limiter.allow("slouching"):
+        return False
     audio_html = """
     <audio autoplay>
         <source src="data:audio/wav;base64,UklGRnoGAABXQVZFZm10IBAAAAABAAEAQB8AAEAfAAABAAgAZGF0YQoGAACBhYqFbF1fdJivrJBhNjVgodDbq2EcBj+a2/LDciUFLIHO8tiJNwgZaLvt559NEAxQp+PwtmMcBjiR1/LMeSwFJHfH8N2QQAoUXrTp66hVFApGn+LtwmYeCD2T2O/Ifi0FLYLOm9mLP2s" type="audio/wav">
     </audio>
     """
     st.markdown(audio_html, unsafe_allow_html=True)
+    return True
 
 def main():
     st.title("🏃‍♂️ AI Posture Corrector")
@@ -201,8 +207,8 @@ def main():
             if result['slouching']:
                 st.error("⚠️ Poor Posture Detected")
                 if enable_audio:
-                    play_audio_alert()
-                    st.info("🔊 Audio alert played!")
+                    if play_audio_alert():
+                        st.info("🔊 Audio alert played!")
             else:
                 st.success("✅ Good Posture")
             
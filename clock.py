@@ -0,0 +1,33 @@
+import time
+
+
+class SystemClock:
+    """Wall-clock time for the live apps"""
+
+    def now(self):
+        return time.monotonic()
+
+    def sleep(self, seconds):
+        time.sleep(seconds)
+
+
+class VirtualClock:
+    """Manually advanced clock, so recorded sessions can be replayed faster than real time"""
+
+    def __init__(self, start=0.0):
+        self._now = float(start)
+
+    def now(self):
+        return self._now
+
+    def advance(self, seconds):
+        self._now += seconds
+        return self._now
+
+    def set(self, timestamp):
+        #replayed timelines carry their own timestamps; time never goes backwards
+        self._now = max(self._now, float(timestamp))
+        return self._now
+
+    def sleep(self, seconds):
+        self.advance(seconds)
@@ -1,10 +1,17 @@
+import argparse
 import cv2
 import mediapipe as mp
-from angle import calculate_angle
+from rules import LandmarkWindow, RuleEngine, default_rules
 import numpy as np
-import time
-import winsound
-import threading
+from alerts import AlertDispatcher, BellSink
+from clock import SystemClock
+from posture import SlouchTimer, step as posture_step
+from recording import LandmarkRecorder
+
+#opt-in: `python main.py --record session.npz` saves the landmarks so simulate.py can replay them
+parser = argparse.ArgumentParser()
+parser.add_argument("--record", metavar="PATH", help="save landmarks and timestamps to an .npz for simulate.py")
+args = parser.parse_args()
 
 webcam = cv2.VideoCapture(0)
 
@@ -21,21 +28,26 @@ mp_pose = mp.solutions.pose
 pose = mp_pose.Pose()
 mp_drawing = mp.solutions.drawing_utils
 
-#implementing 8 seconds slouch timer
-slouch_timer = None
+#implementing the slouch timer; every timing decision reads the same clock
+clock = SystemClock()
 grace_period = 5 
+slouch_timer = SlouchTimer(grace_period, clock=clock)
 posture_status = "GOOD"
 horizontal_distance_display = 0.0
-last_beep_time = 0
+
+#we will be implementing a forward threshold for more or less sensitivity
+forward_threshold = 0.02
+
+#posture rules are compiled once and evaluated over the last ~half second of landmarks
+rule_engine = RuleEngine(default_rules(forward_threshold))
+landmark_window = LandmarkWindow(15)
 beep_interval = 3  # Beep every 3 seconds while slouching
 
-def play_beep():
-    """Play a beep sound in a separate thread to avoid blocking"""
-    try:
-        winsound.Beep(1000, 500)  # 1000Hz frequency, 500ms duration
-    except:
-        # Fallback for systems where winsound doesn't work
-        print('\a')  # System beep
+#one long-lived alert thread; the frame loop only posts events and the dispatcher rate limits them
+alerts = AlertDispatcher(sinks=[BellSink(1000, 500)], min_interval=beep_interval,
+                        clock=clock).start()
+
+recorder = LandmarkRecorder(args.record, frame_width / frame_height) if args.record else None
 
 while True:
     ret, frame = webcam.read()
@@ -55,55 +67,23 @@ while True:
             mp_pose.POSE_CONNECTIONS
         )
         
-    #we will extract the landmarks for the particular joints we want to calculate angle of left elbow
-    try:
-        landmarks = results.pose_landmarks.landmark
-        
-        #getting coordinates for upper half
-        left_shoulder = landmarks[mp_pose.PoseLandmark.LEFT_SHOULDER.value]
-        right_shoulder = landmarks[mp_pose.PoseLandmark.RIGHT_SHOULDER.value]
-        nose = landmarks[mp_pose.PoseLandmark.NOSE.value]
-        
-        #calculating the midpoint between the shoulders
-        shoulder_midpoint_x = (left_shoulder.x + right_shoulder.x) / 2
-        
-        #we will be implementing a forward threshold for more or less sensitivity
-        forward_threshold = 0.02
-        
-        #now we will calculate the angle/horizontal distance which is the absolute distance between the nose and shoulders
-        horizontal_distance = abs(nose.x - shoulder_midpoint_x)
-        
-        is_slouching = horizontal_distance < forward_threshold
-        
-        #posture status
-        if is_slouching:
-            if slouch_timer is None:
-                slouch_timer = time.time()
-            
-            elapsed_time = time.time() - slouch_timer
-            if elapsed_time > grace_period:
-                posture_status = "SLOUCHING"
-                # Play beep sound if enough time has passed since last beep
-                current_time = time.time()
-                if current_time - last_beep_time > beep_interval:
-                    threading.Thread(target=play_beep, daemon=True).start()
-                    last_beep_time = current_time
-        else:
-            slouch_timer = None
-            posture_status = "GOOD"
-        
-        #displaying posture status
-        cv2.rectangle(frame, (0, 0), (400, 70), (245, 117, 16), -1)
-        cv2.putText(frame, 'POSTURE STATUS', (15, 20),
-                cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 0), 1, cv2.LINE_AA)
-        cv2.putText(frame, posture_status, (15, 60),
-                cv2.FONT_HERSHEY_SIMPLEX, 1.5, (255, 255, 255), 2, cv2.LINE_AA)
-        
-        cv2.putText(frame, f'DISTANCE: {round(horizontal_distance, 4)}', (15, 100),
-                cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2, cv2.LINE_AA)
-        
-    except:
-        continue
+    #every frame goes through the shared posture step; frames without a detection age out of the window
+    landmarks = results.pose_landmarks.landmark if results.pose_landmarks else None
+    if recorder is not None:
+        recorder.add(clock.now(), landmarks)
+    posture_status, posture, _ = posture_step(landmarks, landmark_window, rule_engine, slouch_timer,
+                                              alerts, frame_width / frame_height)
+    horizontal_distance = landmark_window.mean("forward_offset")
+    
+    #displaying posture status: GOOD, WARNING during the grace period, then SLOUCHING
+    cv2.rectangle(frame, (0, 0), (400, 70), (245, 117, 16), -1)
+    cv2.putText(frame, 'POSTURE STATUS', (15, 20),
+            cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 0), 1, cv2.LINE_AA)
+    cv2.putText(frame, posture_status, (15, 60),
+            cv2.FONT_HERSHEY_SIMPLEX, 1.5, (255, 255, 255), 2, cv2.LINE_AA)
+    
+    cv2.putText(frame, f'DISTANCE: {round(horizontal_distance, 4)}', (15, 100),
+            cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2, cv2.LINE_AA)
 
     #writing frame to output file
     out.write(frame)
@@ -115,6 +95,9 @@ while True:
     if cv2.waitKey(1) == ord('q'):
         break
     
+alerts.stop()
+if recorder is not None:
+    recorder.save()
 webcam.release()
 out.release()
 cv2.destroyAllWindows()
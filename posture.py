@@ -0,0 +1,65 @@
+from collections import namedtuple
+
+from clock import SystemClock
+
+GOOD = "GOOD"
+WARNING = "WARNING"
+SLOUCHING = "SLOUCHING"
+
+
+class SlouchTimer:
+    """Grace-period logic shared by main.py, streamlit_app.py and simulate.py.
+
+    Feed it one slouching/not-slouching decision per frame; it reports GOOD,
+    WARNING while the grace period runs, and SLOUCHING once it has run out.
+    All timing comes from the injected clock.
+    """
+
+    def __init__(self, grace_period=5, clock=None):
+        self.grace_period = grace_period
+        self.clock = clock if clock is not None else SystemClock()
+        self.started = None
+        self.status = GOOD
+
+    @property
+    def elapsed(self):
+        if self.started is None:
+            return 0.0
+        return self.clock.now() - self.started
+
+    @property
+    def remaining(self):
+        return max(self.grace_period - self.elapsed, 0.0)
+
+    def update(self, is_slouching):
+        if not is_slouching:
+            self.started = None
+            self.status = GOOD
+        else:
+            if self.started is None:
+                self.started = self.clock.now()
+            self.status = SLOUCHING if self.elapsed > self.grace_period else WARNING
+        return self.status
+
+    def reset(self):
+        self.started = None
+        self.status = GOOD
+
+
+FrameResult = namedtuple("FrameResult", ["status", "posture", "alerted"])
+
+
+def step(landmarks, window, engine, timer, alerts=None, aspect_ratio=1.0):
+    """Run one frame through the posture logic, shared by main.py, streamlit_app.py and simulate.py.
+
+    Frames without a detection (landmarks is None) take the same path: they are
+    pushed with zero visibility, so the window decides. Once too few usable
+    frames are left the rules stop firing and the timer resets, which means that
+    stepping out of frame starts a fresh grace period.
+    """
+    window.push(landmarks, aspect_ratio)
+    posture = engine.evaluate(window)
+    status = timer.update(posture.slouching)
+    #the dispatcher rate limits, so posting on every slouching frame gives one beep per interval
+    alerted = status == SLOUCHING and alerts is not None and alerts.post("slouching")
+    return FrameResult(status, posture, alerted)
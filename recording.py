@@ -0,0 +1,51 @@
+"""Landmark recordings that simulate.py can replay.
+
+A recording is an .npz with `landmarks` (frames, 33, 4: x, y, z, visibility),
+`timestamps` (frames,) in seconds and `aspect_ratio` (the frame's width /
+height). Frames without a detection are stored with zero visibility.
+"""
+import numpy as np
+
+from rules import NUM_LANDMARKS
+
+
+class LandmarkRecorder:
+    """Collects landmarks frame by frame and writes them out with save()"""
+
+    def __init__(self, path, aspect_ratio=1.0):
+        self.path = path
+        self.aspect_ratio = aspect_ratio
+        self.timestamps = []
+        self.landmarks = []
+
+    def add(self, timestamp, landmarks):
+        """landmarks: MediaPipe landmarks, a (33, 4) array, or None when nobody was detected"""
+        if landmarks is None:
+            frame = np.zeros((NUM_LANDMARKS, 4), dtype=np.float32)
+        elif isinstance(landmarks, np.ndarray):
+            frame = landmarks.astype(np.float32)
+        else:
+            frame = np.array([(l.x, l.y, l.z, l.visibility) for l in landmarks], dtype=np.float32)
+        self.timestamps.append(timestamp)
+        self.landmarks.append(frame)
+
+    def save(self):
+        start = self.timestamps[0] if self.timestamps else 0.0
+        np.savez_compressed(
+            self.path,
+            landmarks=np.array(self.landmarks, dtype=np.float32).reshape(-1, NUM_LANDMARKS, 4),
+            timestamps=np.array(self.timestamps, dtype=float) - start,
+            aspect_ratio=self.aspect_ratio,
+        )
+
+
+def load_recording(path):
+    """(timeline, aspect_ratio): timeline yields (timestamp, landmarks or None); aspect_ratio is None if not stored"""
+    data = np.load(path)
+    aspect_ratio = float(data["aspect_ratio"]) if "aspect_ratio" in data.files else None
+
+    def timeline():
+        for t, frame in zip(data["timestamps"], data["landmarks"]):
+            yield float(t), frame if frame[:, 3].any() else None
+
+    return timeline(), aspect_ratio
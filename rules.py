@@ -0,0 +1,189 @@
+import math
+from collections import namedtuple
+
+import numpy as np
+
+#MediaPipe pose landmark indices used by the rules (mp_pose.PoseLandmark values)
+LANDMARKS = {
+    "nose": 0,
+    "left_ear": 7,
+    "right_ear": 8,
+    "left_shoulder": 11,
+    "right_shoulder": 12,
+}
+NUM_LANDMARKS = 33
+
+#the window only keeps these landmarks' visibility, in this order
+_TRACKED = list(LANDMARKS)
+_TRACKED_INDEX = [LANDMARKS[name] for name in _TRACKED]
+
+#every metric the window computes for each frame, in column order
+METRICS = ("forward_offset", "head_lateral_tilt", "shoulder_tilt", "head_drop")
+METRIC_INDEX = {name: i for i, name in enumerate(METRICS)}
+
+
+def frame_metrics(points, aspect_ratio=1.0):
+    """All METRICS for one frame, from (x, y, z, visibility) tuples of the tracked landmarks.
+
+    MediaPipe divides x by the frame width and y by the frame height, so the
+    geometric metrics scale x by the aspect ratio (width / height) first to
+    put both axes in the same units.
+    """
+    nose, left_ear, right_ear, left_shoulder, right_shoulder = points
+
+    #horizontal distance between the nose and the shoulder midpoint (the original main.py signal),
+    #kept as a fraction of frame width so the sensitivity setting means what it always did
+    forward_offset = abs(nose[0] - (left_shoulder[0] + right_shoulder[0]) / 2)
+
+    shoulder_x = (left_shoulder[0] + right_shoulder[0]) / 2 * aspect_ratio
+    shoulder_y = (left_shoulder[1] + right_shoulder[1]) / 2
+    ear_x = (left_ear[0] + right_ear[0]) / 2 * aspect_ratio
+    ear_y = (left_ear[1] + right_ear[1]) / 2
+    #sideways lean of the head: angle between the shoulder->ear line and the vertical. A front-facing
+    #camera can't see forward neck inclination (that happens in depth), only this; image y grows downwards
+    head_lateral_tilt = math.degrees(math.atan2(abs(ear_x - shoulder_x), shoulder_y - ear_y))
+
+    #angle of the shoulder line against the horizontal
+    dx = (left_shoulder[0] - right_shoulder[0]) * aspect_ratio
+    dy = left_shoulder[1] - right_shoulder[1]
+    shoulder_tilt = math.degrees(math.atan2(abs(dy), abs(dx)))
+
+    #height of the nose above the shoulder line, relative to shoulder width; smaller means the head has dropped
+    head_drop = (shoulder_y - nose[1]) / max(math.hypot(dx, dy), 1e-6)
+
+    return forward_offset, head_lateral_tilt, shoulder_tilt, head_drop
+
+
+_OPS = {"<": -1.0, ">": 1.0}
+
+
+def default_rules(forward_threshold=0.02):
+    """Built-in posture rules; any one of them firing over the window counts as slouching"""
+    return [
+        {"name": "head_forward", "metric": "forward_offset", "op": "<", "threshold": forward_threshold,
+         "landmarks": ["nose", "left_shoulder", "right_shoulder"]},
+        {"name": "head_lateral_tilt", "metric": "head_lateral_tilt", "op": ">", "threshold": 25.0,
+         "landmarks": ["left_ear", "right_ear", "left_shoulder", "right_shoulder"]},
+        {"name": "shoulder_tilt", "metric": "shoulder_tilt", "op": ">", "threshold": 10.0,
+         "landmarks": ["left_shoulder", "right_shoulder"]},
+        {"name": "head_drop", "metric": "head_drop", "op": "<", "threshold": 0.35,
+         "landmarks": ["nose", "left_shoulder", "right_shoulder"]},
+    ]
+
+
+class LandmarkWindow:
+    """Fixed-size ring buffer of per-frame metrics and landmark visibility.
+
+    Metrics are computed once when a frame is pushed, so evaluating the rules
+    never revisits frames that are already in the window.
+    """
+
+    def __init__(self, size=15):
+        self.size = size
+        self.values = np.zeros((size, len(METRICS)))
+        self.visibility = np.zeros((size, len(_TRACKED)))
+        self.detected = np.zeros(size, dtype=bool)
+        self.count = 0
+        self._next = 0
+
+    def push(self, landmarks, aspect_ratio=1.0):
+        """Add one frame: MediaPipe landmarks, a (33, 4) array, or None when nobody was detected.
+
+        aspect_ratio is the frame's width / height.
+        """
+        i = self._next
+        if landmarks is None:
+            #zero visibility, so every rule ignores this frame
+            self.values[i] = 0.0
+            self.visibility[i] = 0.0
+            self.detected[i] = False
+        else:
+            if isinstance(landmarks, np.ndarray):
+                points = landmarks[_TRACKED_INDEX].tolist()
+            else:
+                points = [(l.x, l.y, l.z, l.visibility) for l in (landmarks[j] for j in _TRACKED_INDEX)]
+            self.values[i] = frame_metrics(points, aspect_ratio)
+            self.visibility[i] = [p[3] for p in points]
+            self.detected[i] = True
+        self._next = (i + 1) % self.size
+        self.count = min(self.count + 1, self.size)
+
+    def filled(self, array):
+        """The part of a per-frame array that holds frames (unordered, which is all the rules need)"""
+        return array if self.count == self.size else array[:self.count]
+
+    def mean(self, metric):
+        """Mean of one metric over the frames with a detection, for display"""
+        column = self.filled(self.values[:, METRIC_INDEX[metric]])[self.filled(self.detected)]
+        return float(column.mean()) if column.size else 0.0
+
+    def clear(self):
+        self.count = 0
+        self._next = 0
+
+
+#per-rule arrays in RuleEngine.names order; see RuleEngine.triggered/score_map for display
+PostureResult = namedtuple("PostureResult", ["slouching", "fired", "scores", "valid"])
+
+
+class RuleEngine:
+    """Posture rules compiled once into arrays and evaluated together over a LandmarkWindow.
+
+    A rule is a dict with a name, a metric from METRICS, an op ("<" or ">"), a
+    threshold and the landmarks that must be visible for a frame to count.
+    Optional keys are min_visibility (default 0.5), ratio, the fraction of
+    usable frames in the window that must violate the rule (default 0.6), and
+    min_frames (default 3).
+    """
+
+    def __init__(self, rules=None):
+        rules = default_rules() if rules is None else rules
+        self.rules = [dict(rule) for rule in rules]
+        self.names = [rule["name"] for rule in self.rules]
+
+        for rule in self.rules:
+            if rule["metric"] not in METRIC_INDEX:
+                raise ValueError(f"Unknown metric {rule['metric']!r} in rule {rule['name']!r}")
+            if rule["op"] not in _OPS:
+                raise ValueError(f"Unknown op {rule['op']!r} in rule {rule['name']!r}")
+
+        self._metric_index = np.array([METRIC_INDEX[r["metric"]] for r in self.rules], dtype=int)
+        self._sign = np.array([_OPS[r["op"]] for r in self.rules])
+        self._threshold = np.array([float(r["threshold"]) for r in self.rules])
+        self._min_visibility = np.array([r.get("min_visibility", 0.5) for r in self.rules])
+        self._ratio = np.array([r.get("ratio", 0.6) for r in self.rules])
+        self._min_frames = np.array([r.get("min_frames", 3) for r in self.rules])
+        #(tracked landmarks, rules) 0/1 matrix of the landmarks each rule is gated on
+        gates = np.zeros((len(_TRACKED), len(self.rules)))
+        for i, rule in enumerate(self.rules):
+            gates[[_TRACKED.index(name) for name in rule.get("landmarks", [])], i] = 1.0
+        #rules sharing a min_visibility are gated with one matrix product; usually there is one group
+        self._gate_groups = [(threshold, self._min_visibility == threshold, gates[:, self._min_visibility == threshold])
+                             for threshold in np.unique(self._min_visibility)]
+
+    def evaluate(self, window):
+        values = window.filled(window.values)[:, self._metric_index]  # (frames, rules)
+        visibility = window.filled(window.visibility)
+
+        #a frame counts for a rule only if none of the rule's landmarks is too faint
+        if len(self._gate_groups) == 1:
+            threshold, _, gates = self._gate_groups[0]
+            usable = (visibility < threshold) @ gates == 0
+        else:
+            usable = np.empty(values.shape, dtype=bool)
+            for threshold, rows, gates in self._gate_groups:
+                usable[:, rows] = (visibility < threshold) @ gates == 0
+        violated = usable & (self._sign * (values - self._threshold) > 0)
+
+        valid = usable.sum(axis=0)
+        scores = violated.sum(axis=0) / np.maximum(valid, 1)
+        fired = (valid >= self._min_frames) & (scores >= self._ratio)
+        return PostureResult(bool(fired.any()), fired, scores, valid)
+
+    def triggered(self, result):
+        """Names of the rules that fired"""
+        return [name for name, hit in zip(self.names, result.fired) if hit]
+
+    def score_map(self, result):
+        """{rule name: fraction of usable frames violating it}"""
+        return dict(zip(self.names, result.scores.tolist()))
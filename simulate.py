@@ -0,0 +1,190 @@
+"""Replay landmark timelines through the posture logic on a virtual clock.
+
+Runs the same posture.step that main.py and streamlit_app.py run on every
+frame, but with time taken from the timeline instead of the wall clock,
+so hours of scenarios finish in seconds.
+
+    python simulate.py                      # built-in scenarios + benchmark at 16:9
+    python simulate.py --aspect-ratio 1.333 # ... for a 4:3 camera
+    python simulate.py --hours 8            # longer benchmark
+    python simulate.py --recording run.npz  # replay landmarks saved by `main.py --record run.npz`
+"""
+import argparse
+import time
+
+import numpy as np
+
+from alerts import AlertDispatcher, LogSink
+from clock import VirtualClock
+from posture import SlouchTimer, GOOD, WARNING, SLOUCHING, step as posture_step
+from recording import load_recording
+from rules import LANDMARKS, NUM_LANDMARKS, LandmarkWindow, RuleEngine, default_rules
+
+#the apps always pass the real frame shape, so the scenarios default to a common webcam
+DEFAULT_ASPECT_RATIO = 16 / 9
+
+#postures for generated timelines, as nose x offset from the shoulder midpoint in frame widths
+GOOD_OFFSET = 0.05
+SLOUCH_OFFSET = 0.0
+
+
+def make_pose(nose_offset=GOOD_OFFSET, aspect_ratio=DEFAULT_ASPECT_RATIO, visibility=0.9):
+    """A front-facing (33, 4) landmark array with the nose `nose_offset` away from the shoulder midpoint.
+
+    The body is laid out in frame-height units and then normalized for the
+    aspect ratio, so apart from the nose offset it is the same upright pose
+    on any camera.
+    """
+    def at(x, y):
+        #x is measured from the frame centre in frame heights
+        return 0.5 + x / aspect_ratio, y
+
+    landmarks = np.zeros((NUM_LANDMARKS, 4))
+    landmarks[:, 3] = visibility
+    landmarks[LANDMARKS["left_shoulder"], :2] = at(0.25, 0.6)
+    landmarks[LANDMARKS["right_shoulder"], :2] = at(-0.25, 0.6)
+    landmarks[LANDMARKS["left_ear"], :2] = at(0.08, 0.35)
+    landmarks[LANDMARKS["right_ear"], :2] = at(-0.08, 0.35)
+    landmarks[LANDMARKS["nose"], :2] = (0.5 + nose_offset, 0.38)
+    return landmarks
+
+
+def generate_timeline(segments, fps=30, noise=0.002, seed=0, aspect_ratio=DEFAULT_ASPECT_RATIO):
+    """Yield (timestamp, landmarks) for segments of (nose_offset, seconds); a None offset means nobody in frame.
+
+    With noise=0 every frame of a segment is the same (read-only) array.
+    """
+    rng = np.random.default_rng(seed)
+    t = 0.0
+    step = 1.0 / fps
+    for offset, seconds in segments:
+        base = None if offset is None else make_pose(offset, aspect_ratio)
+        for _ in range(int(round(seconds * fps))):
+            if base is None or not noise:
+                yield t, base
+            else:
+                frame = base.copy()
+                frame[:, :2] += rng.normal(0.0, noise, (NUM_LANDMARKS, 2))
+                yield t, frame
+            t += step
+
+
+def run(timeline, grace_period=5, beep_interval=3, window_size=15, rules=None, aspect_ratio=DEFAULT_ASPECT_RATIO):
+    """Drive the posture logic over a timeline; returns status transitions and beep times"""
+    clock = VirtualClock()
+    engine = RuleEngine(default_rules() if rules is None else rules)
+    window = LandmarkWindow(window_size)
+    timer = SlouchTimer(grace_period, clock=clock)
+    #never started: post() only rate limits and enqueues, which is all the frame loop does
+    alerts = AlertDispatcher(sinks=[LogSink()], min_interval=beep_interval, clock=clock)
+
+    transitions = []
+    beeps = []
+    frames = 0
+    for t, landmarks in timeline:
+        clock.set(t)
+        status, _, alerted = posture_step(landmarks, window, engine, timer, alerts, aspect_ratio)
+        if alerted:
+            beeps.append(t)
+        if not transitions or transitions[-1][1] != status:
+            transitions.append((t, status))
+        frames += 1
+    return {"transitions": transitions, "beeps": beeps, "frames": frames, "duration": clock.now()}
+
+
+def check_statuses(result, expected):
+    statuses = [status for _, status in result["transitions"]]
+    assert statuses == expected, f"expected {expected}, got {statuses}"
+
+
+def check_grace(result, grace_period, tolerance):
+    transitions = result["transitions"]
+    for (t0, s0), (t1, s1) in zip(transitions, transitions[1:]):
+        if s0 == WARNING and s1 == SLOUCHING:
+            assert abs((t1 - t0) - grace_period) <= tolerance, f"grace period took {t1 - t0:.3f}s"
+
+
+def check_beeps(result, beep_interval, tolerance):
+    beeps = result["beeps"]
+    for earlier, later in zip(beeps, beeps[1:]):
+        gap = later - earlier
+        #beeps inside one slouch episode are beep_interval apart (rounded up to a frame)
+        assert gap >= beep_interval, f"beeps {gap:.3f}s apart"
+        assert gap <= beep_interval + tolerance or gap > 2 * beep_interval, f"beeps {gap:.3f}s apart"
+
+
+def scenarios(fps=30):
+    frame = 1.0 / fps
+    # (name, segments, expected statuses, expected beep count)
+    return [
+        ("good posture only", [(GOOD_OFFSET, 60)], [GOOD], 0),
+        ("short slouch inside grace period", [(GOOD_OFFSET, 10), (SLOUCH_OFFSET, 3), (GOOD_OFFSET, 10)],
+         [GOOD, WARNING, GOOD], 0),
+        ("sustained slouch", [(GOOD_OFFSET, 10), (SLOUCH_OFFSET, 20), (GOOD_OFFSET, 10)],
+         [GOOD, WARNING, SLOUCHING, GOOD], None),
+        ("single bad frames are smoothed out", [(GOOD_OFFSET, 5), (SLOUCH_OFFSET, frame)] * 20,
+         [GOOD], 0),
+        ("leaving the frame resets the timer", [(SLOUCH_OFFSET, 4), (None, 2), (SLOUCH_OFFSET, 4)],
+         [GOOD, WARNING, GOOD, WARNING], 0),
+    ]
+
+
+def run_scenarios(fps=30, grace_period=5, beep_interval=3, aspect_ratio=DEFAULT_ASPECT_RATIO):
+    tolerance = 1.0 / fps + 1e-9
+    for name, segments, expected, beep_count in scenarios(fps):
+        timeline = generate_timeline(segments, fps=fps, aspect_ratio=aspect_ratio)
+        result = run(timeline, grace_period, beep_interval, aspect_ratio=aspect_ratio)
+        check_statuses(result, expected)
+        check_grace(result, grace_period, tolerance)
+        check_beeps(result, beep_interval, tolerance)
+        if beep_count is None:
+            #one beep on entering SLOUCHING, then one every beep_interval until posture recovers
+            slouching = [t for t, s in result["transitions"] if s == SLOUCHING][0]
+            recovered = result["transitions"][-1][0]
+            beep_count = int(np.ceil((recovered - slouching) / beep_interval))
+        assert len(result["beeps"]) == beep_count, f"{name}: {len(result['beeps'])} beeps, expected {beep_count}"
+        print(f"ok   {name}")
+
+
+def benchmark(hours, fps=30, aspect_ratio=DEFAULT_ASPECT_RATIO):
+    #alternate 20 minutes of good posture with 2 minute slouches
+    cycles = max(int(np.ceil(hours * 60 / 22)), 1)
+    segments = [(GOOD_OFFSET, 20 * 60), (SLOUCH_OFFSET, 2 * 60)] * cycles
+    #build the timeline up front so only the decision logic is timed
+    timeline = list(generate_timeline(segments, fps=fps, noise=0.0, aspect_ratio=aspect_ratio))
+    start = time.perf_counter()
+    result = run(timeline, aspect_ratio=aspect_ratio)
+    elapsed = time.perf_counter() - start
+    simulated = result["duration"]
+    print(f"simulated {simulated / 3600:.1f}h ({result['frames']} frames, {len(result['beeps'])} beeps) "
+          f"in {elapsed:.2f}s: {simulated / elapsed:.0f}x real time, "
+          f"{elapsed / result['frames'] * 1e6:.1f}us per frame")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--recording", help="replay an .npz of recorded landmarks instead of the scenarios")
+    parser.add_argument("--hours", type=float, default=1.0, help="simulated length of the benchmark")
+    parser.add_argument("--fps", type=int, default=30)
+    parser.add_argument("--grace-period", type=float, default=5)
+    parser.add_argument("--beep-interval", type=float, default=3)
+    parser.add_argument("--aspect-ratio", type=float,
+                        help=f"frame width / height (default: the recording's, else {DEFAULT_ASPECT_RATIO:.3f})")
+    args = parser.parse_args()
+
+    if args.recording:
+        timeline, recorded_ratio = load_recording(args.recording)
+        aspect_ratio = args.aspect_ratio or recorded_ratio or DEFAULT_ASPECT_RATIO
+        result = run(timeline, args.grace_period, args.beep_interval, aspect_ratio=aspect_ratio)
+        for t, status in result["transitions"]:
+            print(f"{t:10.2f}s  {status}")
+        print(f"{len(result['beeps'])} beeps")
+        return
+
+    aspect_ratio = args.aspect_ratio or DEFAULT_ASPECT_RATIO
+    run_scenarios(args.fps, args.grace_period, args.beep_interval, aspect_ratio)
+    benchmark(args.hours, args.fps, aspect_ratio)
+
+
+if __name__ == "__main__":
+    main()
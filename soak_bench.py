@@ -0,0 +1,124 @@
+"""Headless soak benchmark for the live mode in streamlit_app.py.
+
+Drives the app through Streamlit's AppTest (needs a Streamlit release whose
+AppTest can set camera_input values): starts monitoring, then feeds thousands
+of camera captures and reports per-rerun latency, process memory growth and
+the size of the session state.
+
+    python soak_bench.py --image me.jpg                 # 2000 captures
+    python soak_bench.py --image me.jpg --cycles 5000
+
+The image must show a person: captures without a detection skip the rule
+engine, landmark drawing and the annotated preview, so the run stops if none
+of the first captures is detected.
+"""
+import argparse
+import gc
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+from streamlit.testing.v1 import AppTest
+
+APP = os.path.join(os.path.dirname(os.path.abspath(__file__)), "streamlit_app.py")
+
+
+def memory_mb():
+    """(megabytes, label): current RSS from psutil or /proc, else peak RSS; (None, label) if neither is available"""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / 2**20, "rss MB"
+    except ImportError:
+        pass
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20, "rss MB"
+    except OSError:
+        pass
+    try:
+        import resource  # not available on Windows
+    except ImportError:
+        return None, "mem MB"
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    #bytes on macOS, kilobytes elsewhere
+    return peak / (2**20 if sys.platform == "darwin" else 2**10), "peak MB"
+
+
+def format_mb(value, sign=""):
+    return "n/a" if value is None else f"{value:{sign}.1f}"
+
+
+def make_captures(image_path, count=8):
+    """A few JPEG captures of the photo to cycle through, so consecutive frames differ"""
+    base = cv2.imread(image_path)
+    if base is None:
+        raise SystemExit(f"Could not read {image_path}")
+    rng = np.random.default_rng(0)
+    captures = []
+    for _ in range(count):
+        frame = cv2.add(base, rng.integers(0, 8, base.shape, dtype=np.uint8))
+        ok, encoded = cv2.imencode(".jpg", frame)
+        captures.append(encoded.tobytes())
+    return captures
+
+
+def session_size(at):
+    state = at.session_state
+    return len(list(state)), len(state["history"])
+
+
+def soak(cycles, captures, report_every):
+    at = AppTest.from_file(APP, default_timeout=60)
+    at.run()
+    at.button[0].click().run()
+    assert at.session_state["monitoring"], "START MONITORING did not start the session"
+
+    latencies = []
+    detected = 0
+    baseline = None
+    print(f"{'cycle':>7} {memory_mb()[1]:>8} {'growth':>8} {'p50 ms':>8} {'p95 ms':>8} {'keys':>5} {'history':>8}")
+    for cycle in range(1, cycles + 1):
+        at.camera_input[0].set_value(("frame.jpg", captures[cycle % len(captures)], "image/jpeg"))
+        start = time.perf_counter()
+        at.run()
+        latencies.append(time.perf_counter() - start)
+        if at.exception:
+            raise SystemExit(f"App raised on cycle {cycle}: {at.exception[0].value}")
+        if at.session_state["posture_status"] != "NO DETECTION":
+            detected += 1
+
+        if cycle % report_every == 0 or cycle == cycles:
+            if not detected:
+                raise SystemExit(f"No person detected in {cycle} captures; pass an --image that shows one")
+            gc.collect()
+            memory, _ = memory_mb()
+            #measure growth from the first report, after caches and the pose model are warm
+            if baseline is None:
+                baseline = memory
+            recent = np.array(latencies[-report_every:]) * 1000
+            keys, history = session_size(at)
+            growth = None if memory is None else memory - baseline
+            print(f"{cycle:>7} {format_mb(memory):>8} {format_mb(growth, '+'):>8} {np.percentile(recent, 50):>8.1f} "
+                  f"{np.percentile(recent, 95):>8.1f} {keys:>5} {history:>8}")
+
+    assert at.session_state["frame_count"] == cycles, "some captures were not analyzed"
+    latencies = np.array(latencies) * 1000
+    memory, _ = memory_mb()
+    growth = "unavailable (install psutil)" if memory is None else f"{memory - baseline:+.1f}MB"
+    print(f"\n{cycles} reruns ({detected} with a detection): mean {latencies.mean():.1f}ms, "
+          f"p95 {np.percentile(latencies, 95):.1f}ms, memory growth after warm-up {growth}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--image", required=True, help="photo of a person to use for the captures")
+    parser.add_argument("--cycles", type=int, default=2000)
+    parser.add_argument("--report-every", type=int, default=250)
+    args = parser.parse_args()
+    soak(args.cycles, make_captures(args.image), args.report_every)
+
+
+if __name__ == "__main__":
+    main()
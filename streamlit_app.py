@@ -2,9 +2,11 @@ import streamlit as st
 import cv2
 import mediapipe as mp
 import numpy as np
-import time
+from collections import deque
 from PIL import Image
-import threading
+from alerts import RateLimiter
+from rules import LandmarkWindow, RuleEngine, default_rules
+from posture import SlouchTimer, GOOD, SLOUCHING, step as posture_step
 
 # Set page configuration
 st.set_page_config(
@@ -47,17 +49,42 @@ def load_pose_model():
 
 mp_pose, pose, mp_drawing = load_pose_model()
 
+# Rules only depend on the sensitivity, so compile them once per value. Captures are taken
+# by hand, so a rule may fire from the first capture and smooths over the last few as they come in
+@st.cache_resource
+def load_rule_engine(sensitivity):
+    return RuleEngine([dict(rule, min_frames=1) for rule in default_rules(sensitivity)])
+
+# Live sessions can run for hours, so everything kept per session is fixed-size
+# The camera widget alternates between two keys: switching keys after each capture gives a fresh
+# widget (one click per sample) while the set of widget identities stays fixed
+CAMERA_KEYS = ("live_camera_0", "live_camera_1")
+PREVIEW_WIDTH = 480
+HISTORY_LENGTH = 300
+
 # Session state initialization
 if 'monitoring' not in st.session_state:
     st.session_state.monitoring = False
 if 'slouch_timer' not in st.session_state:
-    st.session_state.slouch_timer = None
+    st.session_state.slouch_timer = SlouchTimer()
 if 'posture_status' not in st.session_state:
     st.session_state.posture_status = "READY"
 if 'last_distance' not in st.session_state:
     st.session_state.last_distance = 0.0
 if 'frame_count' not in st.session_state:
     st.session_state.frame_count = 0
+if 'landmark_window' not in st.session_state:
+    # One entry per manual capture, so keep just the last few
+    st.session_state.landmark_window = LandmarkWindow(3)
+if 'history' not in st.session_state:
+    st.session_state.history = deque(maxlen=HISTORY_LENGTH)
+if 'preview' not in st.session_state:
+    st.session_state.preview = None
+if 'camera_slot' not in st.session_state:
+    st.session_state.camera_slot = 0
+if 'audio_limiter' not in st.session_state:
+    # Only re-send the audio tag every few seconds instead of on every rerun
+    st.session_state.audio_limiter = RateLimiter(3.0)
 
 def analyze_frame(frame, sensitivity, grace_period):
     """Analyze a single frame for posture"""
@@ -67,7 +94,16 @@ def analyze_frame(frame, sensitivity, grace_period):
     # Process with MediaPipe
     results = pose.process(image_rgb)
     
-    if not results.pose_landmarks:
+    landmarks = results.pose_landmarks.landmark if results.pose_landmarks else None
+    
+    # Every capture goes through the shared posture step, including ones with nobody in frame
+    timer = st.session_state.slouch_timer
+    timer.grace_period = grace_period
+    timer_status, posture, _ = posture_step(landmarks, st.session_state.landmark_window,
+                                            load_rule_engine(sensitivity), timer,
+                                            aspect_ratio=frame.shape[1] / frame.shape[0])
+    
+    if landmarks is None:
         return frame, "NO DETECTION", 0.0
     
     # Draw landmarks
@@ -79,58 +115,50 @@ def analyze_frame(frame, sensitivity, grace_period):
         mp_drawing.DrawingSpec(color=(245,66,230), thickness=2, circle_radius=2)
     )
     
-    try:
-        landmarks = results.pose_landmarks.landmark
-        
-        # Get key points
-        left_shoulder = landmarks[mp_pose.PoseLandmark.LEFT_SHOULDER.value]
-        right_shoulder = landmarks[mp_pose.PoseLandmark.RIGHT_SHOULDER.value]
-        nose = landmarks[mp_pose.PoseLandmark.NOSE.value]
-        
-        # Calculate metrics
-        shoulder_midpoint_x = (left_shoulder.x + right_shoulder.x) / 2
-        horizontal_distance = abs(nose.x - shoulder_midpoint_x)
-        
-        # Determine posture
-        is_slouching = horizontal_distance < sensitivity
-        current_time = time.time()
-        
-        if is_slouching:
-            if st.session_state.slouch_timer is None:
-                st.session_state.slouch_timer = current_time
-            
-            elapsed = current_time - st.session_state.slouch_timer
-            if elapsed > grace_period:
-                status = "SLOUCHING"
-            else:
-                status = f"WARNING ({int(grace_period - elapsed)}s)"
-        else:
-            st.session_state.slouch_timer = None
-            status = "GOOD POSTURE"
-        
-        st.session_state.last_distance = horizontal_distance
-        
-        # Add status overlay
-        status_color = (0, 0, 255) if status == "SLOUCHING" else (0, 255, 0) if status == "GOOD POSTURE" else (255, 165, 0)
-        
-        cv2.rectangle(frame, (0, 0), (500, 90), (245, 117, 16), -1)
-        cv2.putText(frame, 'POSTURE STATUS', (15, 30),
-                    cv2.FONT_HERSHEY_SIMPLEX, 0.9, (255, 255, 255), 2, cv2.LINE_AA)
-        cv2.putText(frame, status, (15, 70),
-                    cv2.FONT_HERSHEY_SIMPLEX, 1.3, status_color, 3, cv2.LINE_AA)
-        
-        # Add distance info
-        cv2.putText(frame, f'Distance: {horizontal_distance:.4f}', (15, 110),
-                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2, cv2.LINE_AA)
-        
-        return frame, status, horizontal_distance
-        
-    except Exception as e:
-        return frame, f"ERROR: {str(e)}", 0.0
+    horizontal_distance = st.session_state.landmark_window.mean("forward_offset")
+    if timer_status == SLOUCHING:
+        status = "SLOUCHING"
+    elif timer_status == GOOD:
+        status = "GOOD POSTURE"
+    else:
+        status = f"WARNING ({int(timer.remaining)}s)"
+    
+    st.session_state.last_distance = horizontal_distance
+    
+    # Add status overlay
+    status_color = (0, 0, 255) if status == "SLOUCHING" else (0, 255, 0) if status == "GOOD POSTURE" else (255, 165, 0)
+    
+    cv2.rectangle(frame, (0, 0), (500, 90), (245, 117, 16), -1)
+    cv2.putText(frame, 'POSTURE STATUS', (15, 30),
+                cv2.FONT_HERSHEY_SIMPLEX, 0.9, (255, 255, 255), 2, cv2.LINE_AA)
+    cv2.putText(frame, status, (15, 70),
+                cv2.FONT_HERSHEY_SIMPLEX, 1.3, status_color, 3, cv2.LINE_AA)
+    
+    # Add distance info
+    cv2.putText(frame, f'Distance: {horizontal_distance:.4f}', (15, 110),
+                cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2, cv2.LINE_AA)
+    
+    return frame, status, horizontal_distance
+
+def make_preview(frame):
+    """Downsample an annotated BGR frame to a small RGB preview"""
+    height, width = frame.shape[:2]
+    if width > PREVIEW_WIDTH:
+        frame = cv2.resize(frame, (PREVIEW_WIDTH, int(height * PREVIEW_WIDTH / width)), interpolation=cv2.INTER_AREA)
+    return cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+
+def reset_session():
+    """Clear per-session buffers when monitoring (re)starts"""
+    st.session_state.frame_count = 0
+    st.session_state.history.clear()
+    st.session_state.landmark_window.clear()
+    st.session_state.slouch_timer.reset()
+    st.session_state.preview = None
+    st.session_state.camera_slot = 0
 
 def main():
     st.markdown('<div class="main-header">🏃‍♂️ AI Posture Corrector - Live Mode</div>', unsafe_allow_html=True)
-    st.markdown("**Continuous posture monitoring with auto-refresh**")
+    st.markdown("**Continuous posture monitoring with periodic camera captures**")
     
     # Sidebar
     st.sidebar.header("⚙️ Settings")
@@ -147,12 +175,6 @@ def main():
         help="Time before alerting"
     )
     
-    refresh_rate = st.sidebar.slider(
-        "Refresh Rate (seconds)",
-        0.5, 3.0, 1.0, 0.5,
-        help="How often to update (lower = smoother but more CPU)"
-    )
-    
     enable_audio = st.sidebar.checkbox("Enable Audio Alerts", value=True)
     
     st.sidebar.markdown("---")
@@ -176,7 +198,7 @@ def main():
         with button_col1:
             if st.button("▶️ START MONITORING", disabled=st.session_state.monitoring, use_container_width=True):
                 st.session_state.monitoring = True
-                st.session_state.frame_count = 0
+                reset_session()
                 st.rerun()
         
         with button_col2:
@@ -190,10 +212,9 @@ def main():
         
         # Live monitoring
         if st.session_state.monitoring:
-            # Use camera input with auto-refresh
             camera_photo = st.camera_input(
                 "Live Feed", 
-                key=f"camera_{st.session_state.frame_count}",
+                key=CAMERA_KEYS[st.session_state.camera_slot],
                 label_visibility="collapsed"
             )
             
@@ -205,15 +226,18 @@ def main():
                 # Analyze
                 processed_frame, status, distance = analyze_frame(frame, sensitivity, grace_period)
                 st.session_state.posture_status = status
+                st.session_state.history.append(distance)
+                st.session_state.frame_count += 1
                 
-                # Display
-                display_frame = cv2.cvtColor(processed_frame, cv2.COLOR_BGR2RGB)
-                video_placeholder.image(display_frame, use_container_width=True)
+                # Keep only a small preview of the latest frame
+                st.session_state.preview = make_preview(processed_frame)
                 
-                # Auto-refresh
-                time.sleep(refresh_rate)
-                st.session_state.frame_count += 1
+                # Swap to the other (empty) camera widget so the next sample is one click
+                st.session_state.camera_slot = 1 - st.session_state.camera_slot
                 st.rerun()
+            
+            if st.session_state.preview is not None:
+                video_placeholder.image(st.session_state.preview, output_format="JPEG", use_container_width=True)
             else:
                 video_placeholder.info("📸 Waiting for camera... Please allow camera access in your browser.")
         else:
@@ -227,7 +251,7 @@ def main():
         
         if status == "SLOUCHING":
             st.error(f"⚠️ **{status}**")
-            if enable_audio:
+            if enable_audio and st.session_state.audio_limiter.allow("slouching"):
                 st.markdown("""
                 <audio autoplay>
                     <source src="data:audio/wav;base64,UklGRnoGAABXQVZFZm10IBAAAAABAAEAQB8AAEAfAAABAAgA" type="audio/wav">
@@ -258,6 +282,8 @@ def main():
         
         if st.session_state.monitoring:
             st.metric("Frames Analyzed", st.session_state.frame_count)
+            if st.session_state.history:
+                st.line_chart(list(st.session_state.history), height=150)
         
         # Recommendations
         st.markdown("---")
@@ -301,7 +327,7 @@ def main():
     💡 **Note:** This uses periodic camera captures for live monitoring. 
     For true real-time video, you'll need to run the app locally using `main.py` which uses direct webcam access.
     
-    **Refresh Rate:** Adjust in settings for smoother updates (higher CPU usage) or better performance (slower updates).
+    **Captures:** Click the camera button whenever you want your posture re-checked; the last few captures are combined, and the preview and history stay small so long sessions don't slow down.
     """)
     
     with st.expander("🔧 Troubleshooting"):
@@ -312,7 +338,7 @@ def main():
         - Try a different browser (Chrome/Edge recommended)
         
         **Slow/Laggy?**
-        - Increase refresh rate in settings
+        - Take captures less often
         - Close other applications
         - Use better lighting for faster processing
         
@@ -0,0 +1,81 @@
+import threading
+
+import pytest
+
+from alerts import AlertDispatcher, RateLimiter
+from clock import VirtualClock
+
+
+def test_rate_limiter_allows_once_per_interval():
+    clock = VirtualClock()
+    limiter = RateLimiter(3.0, clock=clock)
+    assert limiter.allow("slouching")
+    clock.advance(2.9)
+    assert not limiter.allow("slouching")
+    clock.advance(0.1)
+    assert limiter.allow("slouching")
+
+
+def test_rate_limiter_keys_are_independent_and_resettable():
+    limiter = RateLimiter(3.0, clock=VirtualClock())
+    assert limiter.allow("a")
+    assert limiter.allow("b")
+    assert not limiter.allow("a")
+    limiter.reset("a")
+    assert limiter.allow("a")
+    assert not limiter.allow("b")
+
+
+def test_post_is_rate_limited():
+    clock = VirtualClock()
+    dispatcher = AlertDispatcher(sinks=[], min_interval=3.0, clock=clock)
+    assert dispatcher.post("slouching")
+    assert not dispatcher.post("slouching")
+    clock.advance(3.0)
+    assert dispatcher.post("slouching")
+
+
+def test_full_queue_drops_oldest_and_counts_it():
+    dispatcher = AlertDispatcher(sinks=[], min_interval=0, maxlen=2, clock=VirtualClock())
+    for key in ("a", "b", "c"):
+        assert dispatcher.post(key)
+    assert dispatcher.dropped == 1
+    assert dispatcher._drain() == [("b", None), ("c", None)]
+
+
+def test_identical_alerts_in_one_batch_are_delivered_once():
+    dispatcher = AlertDispatcher(sinks=[], min_interval=0, clock=VirtualClock())
+    dispatcher.post("a", 1)
+    dispatcher.post("a", 2)
+    dispatcher.post("b", 3)
+    assert dispatcher._drain() == [("a", 1), ("b", 3)]
+    assert dispatcher._drain() == []
+
+
+def test_failing_sink_does_not_stop_the_others():
+    received = []
+
+    def broken(key, payload):
+        raise OSError("no audio device")
+
+    dispatcher = AlertDispatcher(sinks=[broken, lambda key, payload: received.append(key)], min_interval=0)
+    dispatcher.start()
+    dispatcher.post("slouching")
+    assert dispatcher.stop(timeout=2.0)
+    assert received == ["slouching"]
+
+
+def test_restart_waits_for_a_blocked_worker():
+    release = threading.Event()
+    dispatcher = AlertDispatcher(sinks=[lambda key, payload: release.wait()], min_interval=0).start()
+    dispatcher.post("slouching")
+
+    assert not dispatcher.stop(timeout=0.05)
+    with pytest.raises(RuntimeError):
+        dispatcher.start()
+
+    release.set()
+    assert dispatcher.stop(timeout=2.0)
+    dispatcher.start()
+    assert sum(t.name == "alert-dispatcher" and t.is_alive() for t in threading.enumerate()) == 1
+    dispatcher.stop()
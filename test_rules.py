@@ -0,0 +1,94 @@
+import math
+
+import numpy as np
+import pytest
+
+from rules import LANDMARKS, NUM_LANDMARKS, LandmarkWindow, RuleEngine, default_rules
+
+
+def make_pose(nose_offset=0.05, ear_visibility=0.9, tilt_degrees=0.0, aspect_ratio=1.0):
+    """Front-facing landmarks, shoulders 0.3 frame widths apart"""
+    landmarks = np.zeros((NUM_LANDMARKS, 4))
+    landmarks[:, 3] = 0.9
+    half_dx = 0.15
+    half_dy = half_dx * aspect_ratio * math.tan(math.radians(tilt_degrees))
+    landmarks[LANDMARKS["left_shoulder"], :2] = (0.5 + half_dx, 0.6 + half_dy)
+    landmarks[LANDMARKS["right_shoulder"], :2] = (0.5 - half_dx, 0.6 - half_dy)
+    landmarks[LANDMARKS["left_ear"], :2] = (0.56, 0.35)
+    landmarks[LANDMARKS["right_ear"], :2] = (0.44, 0.35)
+    landmarks[[LANDMARKS["left_ear"], LANDMARKS["right_ear"]], 3] = ear_visibility
+    landmarks[LANDMARKS["nose"], :2] = (0.5 + nose_offset, 0.35)
+    return landmarks
+
+
+def head_forward_engine(**options):
+    return RuleEngine([dict(default_rules()[0], **options)])
+
+
+def fill(window, *frames):
+    for frame in frames:
+        window.push(frame)
+    return window
+
+
+GOOD = make_pose(nose_offset=0.05)
+SLOUCH = make_pose(nose_offset=0.0)
+
+
+def test_good_pose_fires_nothing():
+    engine = RuleEngine()
+    result = engine.evaluate(fill(LandmarkWindow(5), *[GOOD] * 5))
+    assert not result.slouching
+    assert engine.triggered(result) == []
+
+
+def test_ratio_voting():
+    engine = head_forward_engine(ratio=0.6)
+    assert engine.evaluate(fill(LandmarkWindow(5), *[SLOUCH] * 3, *[GOOD] * 2)).slouching
+    assert not engine.evaluate(fill(LandmarkWindow(5), *[SLOUCH] * 2, *[GOOD] * 3)).slouching
+
+
+def test_min_frames():
+    engine = head_forward_engine(min_frames=3)
+    window = fill(LandmarkWindow(5), SLOUCH, SLOUCH)
+    assert not engine.evaluate(window).slouching
+    window.push(SLOUCH)
+    assert engine.evaluate(window).slouching
+
+
+def test_frames_without_detection_are_not_usable():
+    engine = head_forward_engine()
+    window = fill(LandmarkWindow(5), SLOUCH, SLOUCH, SLOUCH, None, None)
+    result = engine.evaluate(window)
+    assert result.valid.tolist() == [3]
+    assert result.slouching
+    window.push(None)
+    assert not engine.evaluate(window).slouching
+
+
+def test_visibility_gating_is_per_rule():
+    engine = RuleEngine()
+    window = fill(LandmarkWindow(3), *[make_pose(ear_visibility=0.3)] * 3)
+    valid = dict(zip(engine.names, engine.evaluate(window).valid.tolist()))
+    assert valid == {"head_forward": 3, "head_lateral_tilt": 0, "shoulder_tilt": 3, "head_drop": 3}
+
+
+def test_ring_buffer_keeps_only_the_latest_frames():
+    engine = head_forward_engine()
+    window = fill(LandmarkWindow(3), *[SLOUCH] * 3, *[GOOD] * 3)
+    assert window.count == 3
+    result = engine.evaluate(window)
+    assert not result.slouching
+    assert engine.score_map(result) == {"head_forward": 0.0}
+
+
+@pytest.mark.parametrize("aspect_ratio", [1.0, 4 / 3, 16 / 9])
+def test_metrics_are_independent_of_aspect_ratio(aspect_ratio):
+    window = LandmarkWindow(1)
+    window.push(make_pose(tilt_degrees=7.0, aspect_ratio=aspect_ratio), aspect_ratio)
+    assert window.mean("shoulder_tilt") == pytest.approx(7.0)
+
+
+def test_unknown_metric_is_rejected():
+    with pytest.raises(ValueError):
+        RuleEngine([{"name": "x", "metric": "nope", "op": "<", "threshold": 1.0}])